@@ -1,11 +1,18 @@
 import os
 import sys
+import argparse
 import json
 import subprocess
 import platform
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import re
+import signal
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # Optional Windows notifications
@@ -18,10 +25,31 @@ if platform.system() == "Windows":
 else:
     toaster = None
 
+# Optional faster JSON decoding for large commit pages
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional HTTP cache for GitHub responses (conditional requests via ETag/Cache-Control)
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
 # CONFIG
 GITHUB_OWNER = os.getenv("GITHUB_OWNER") or "Ivxn404"  # default, replace or export env var
 GITHUB_TOKEN = os.getenv("GITHUB_PAT")
 QUIET_HOURS = (22, 7)  # 10 PM to 7 AM
+MAX_WORKERS = 8  # concurrent repo fetches
+RATE_LIMIT_FLOOR = 10  # pause until reset when fewer requests remain
+MAX_RETRIES = 5
+HTTP_CACHE_EXPIRE = 600  # seconds; GitHub's Cache-Control headers take precedence
+MAX_RATE_LIMIT_WAIT = 300  # seconds; longer rate-limit waits give up instead of hanging the CLI
+GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH_SIZE = 10  # repository aliases per query; larger batches tend to time out
+
+FIRST_INT_RE = re.compile(r"(\d+)")
 
 BASE_DIR = None  # will be detected as git root folder
 DATA_DIR = None  # will be BASE_DIR/.timebox
@@ -33,8 +61,8 @@ def debug_print(*args):
     pass
 
 
-def is_in_quiet_hours():
-    now = datetime.now()
+def is_in_quiet_hours(now=None):
+    now = now or datetime.now()
     start, end = QUIET_HOURS
     if start < end:
         return start <= now.hour < end
@@ -42,6 +70,32 @@ def is_in_quiet_hours():
         return now.hour >= start or now.hour < end
 
 
+def write_atomic(path, text):
+    # Serialize once, write in a single call, then swap the file in so a crash never truncates it
+    tmp = path + ".tmp"
+    with open(tmp, "wb", buffering=0) as f:
+        f.write(text.encode("utf-8"))
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def parse_json(response):
+    if orjson:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def to_local_date(timestamp):
+    # GitHub reports UTC timestamps; streaks and daily counts use the local calendar day
+    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return dt.astimezone().date().isoformat()
+
+
+def recent_days(today, days=7):
+    # "YYYY-MM-DD" keys for the window, oldest first; commit and mood histograms are keyed the same way
+    return [str(today - timedelta(days=i)) for i in reversed(range(days))]
+
+
 def get_git_root():
     try:
         res = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True)
@@ -52,108 +106,333 @@ def get_git_root():
 
 
 class GitAnalyzer:
-    def __init__(self, owner, token):
+    def __init__(self, owner, token, cache_file=None, http_cache_name=None):
         self.owner = owner
         self.token = token
-
-    def github_api_get(self, url, params=None):
-        headers = {}
+        self.cache_file = cache_file
+        self.commit_cache = {}  # repo name -> {"etag", "sha", "dates"}
+        self.rate_limited_until = 0  # skip requests until this time once a long wait was refused
+        self.notice_until = 0  # avoid repeating the wait notice from every worker thread
+        if requests_cache and http_cache_name:
+            self.session = requests_cache.CachedSession(
+                http_cache_name, backend='sqlite', expire_after=HTTP_CACHE_EXPIRE, cache_control=True)
+        else:
+            self.session = requests.Session()
+        # Keep-alive pool sized for the fetch workers; transient 5xx errors are retried here,
+        # rate-limit 403/429 responses are handled in send_with_backoff
+        retry = Retry(total=MAX_RETRIES, backoff_factor=1.5, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset(["GET", "POST"]), raise_on_status=False)
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS, max_retries=retry))
+        self.session.headers['Accept'] = 'application/vnd.github+json'
         if self.token:
-            headers['Authorization'] = f'token {self.token}'
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code != 200:
+            self.session.headers['Authorization'] = f'token {self.token}'
+
+    def rate_limit_sleep(self, delay, backoff=False):
+        # Returns False when the wait is too long to block on
+        if delay > MAX_RATE_LIMIT_WAIT:
+            if time.time() >= self.rate_limited_until:
+                print(f"⚠️ GitHub rate limit reached; resets in {delay:.0f}s. Skipping remaining requests.",
+                      file=sys.stderr)
+            self.rate_limited_until = time.time() + delay
+            return False
+        if time.time() >= self.notice_until:
+            if backoff:
+                print(f"⏳ GitHub rate limit reached, backing off {delay:.0f}s before retrying...", file=sys.stderr)
+            else:
+                print(f"⏳ GitHub rate limit reached, waiting {delay:.0f}s until reset...", file=sys.stderr)
+            self.notice_until = time.time() + delay
+        time.sleep(delay)
+        return True
+
+    def wait_for_rate_limit(self, response):
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        if int(remaining) < RATE_LIMIT_FLOOR:
+            delay = max(0, int(reset) - time.time()) + 1
+            if delay <= MAX_RATE_LIMIT_WAIT:
+                self.rate_limit_sleep(delay)
+            # Otherwise keep using the remaining quota; exhausting it gives up in send_with_backoff
+
+    def is_rate_limited(self, response):
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        # A plain 403 is a permissions error; only primary/secondary rate limits are worth retrying
+        return (response.headers.get('X-RateLimit-Remaining') == '0'
+                or 'Retry-After' in response.headers
+                or 'rate limit' in response.text.lower())
+
+    def rate_limit_delay(self, response):
+        # Server-provided wait, or None when GitHub gave no hint
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return int(retry_after)
+        reset = response.headers.get('X-RateLimit-Reset')
+        if response.headers.get('X-RateLimit-Remaining') == '0' and reset:
+            return max(0, int(reset) - time.time()) + 1
+        return None
+
+    def send_with_backoff(self, method, url, **kwargs):
+        for attempt in range(MAX_RETRIES):
+            if time.time() < self.rate_limited_until:
+                return None
+            response = self.session.request(method, url, **kwargs)
+            if getattr(response, "from_cache", False):
+                return response  # served by requests-cache; its rate-limit headers are stale
+            if not self.is_rate_limited(response):
+                self.wait_for_rate_limit(response)
+                return response
+            debug_print(f"GitHub API rate limited ({response.status_code}): {url}")
+            if attempt == MAX_RETRIES - 1:
+                break  # no request follows, so waiting would only block
+            delay = self.rate_limit_delay(response)
+            if delay is not None:
+                slept = self.rate_limit_sleep(delay)
+            else:
+                slept = self.rate_limit_sleep(min(60 * 2 ** attempt, MAX_RATE_LIMIT_WAIT), backoff=True)
+            if not slept:
+                return None
+        debug_print(f"GitHub API still rate limited after {MAX_RETRIES} attempts: {url}")
+        return None
+
+    def github_api_request(self, url, params=None, headers=None):
+        response = self.send_with_backoff('GET', url, params=params, headers=headers)
+        if response is None:
+            return None
+        if response.status_code not in (200, 304):
             debug_print(f"GitHub API error {response.status_code}: {response.text}")
             return None
-        return response.json()
+        return response
+
+    def paginate(self, url, params=None):
+        # Follow the Link header instead of probing for an empty trailing page.
+        # Returns (items, complete); complete is False if a page request failed.
+        items = []
+        while url:
+            response = self.github_api_request(url, params)
+            if response is None:
+                return items, False
+            items.extend(parse_json(response))
+            url = response.links.get('next', {}).get('url')
+            params = None  # the next link already carries the query string
+        return items, True
 
     def get_all_repos(self):
-        repos = []
-        page = 1
-        while True:
-            url = f"https://api.github.com/users/{self.owner}/repos"
-            params = {'per_page': 100, 'page': page}
-            data = self.github_api_get(url, params)
-            if not data:
-                break
-            if len(data) == 0:
-                break
-            repos.extend(data)
-            page += 1
-        return repos
+        url = f"https://api.github.com/users/{self.owner}/repos"
+        return self.paginate(url, {'per_page': 100})
+
+    def load_commit_cache(self):
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                self.commit_cache = json.load(f)
+        except Exception:
+            self.commit_cache = {}
+
+    def save_commit_cache(self):
+        if not self.cache_file:
+            return
+        write_atomic(self.cache_file, json.dumps(self.commit_cache, separators=(",", ":")))
 
     def get_commit_dates_for_repo(self, repo_name):
+        debug_print(f"Fetching commits for {repo_name}")
+        cached = self.commit_cache.get(repo_name, {})
+        url = f"https://api.github.com/repos/{self.owner}/{repo_name}/commits"
+        # A 304 for an unchanged first page does not count against the rate limit
+        headers = {'If-None-Match': cached['etag']} if cached.get('etag') else None
+        response = self.github_api_request(url, {'per_page': 100}, headers)
+        if response is None:
+            return cached.get('dates', [])
+        if response.status_code == 304:
+            return cached['dates']
+
+        etag = response.headers.get('ETag')
+        head_sha = None
         dates = []
-        page = 1
-        while True:
-            url = f"https://api.github.com/repos/{self.owner}/{repo_name}/commits"
-            params = {'per_page': 100, 'page': page}
-            data = self.github_api_get(url, params)
-            if not data:
-                break
-            if len(data) == 0:
-                break
-            for commit in data:
+        complete = False
+        while response is not None:
+            for commit in parse_json(response):
+                if head_sha is None:
+                    head_sha = commit.get('sha')
+                if cached.get('sha') and commit.get('sha') == cached['sha']:
+                    # Everything older than this is already cached
+                    dates.extend(cached['dates'])
+                    complete = True
+                    break
                 try:
-                    dates.append(commit['commit']['author']['date'][:10])
+                    dates.append(to_local_date(commit['commit']['author']['date']))
                 except KeyError:
                     pass
-            page += 1
+            if complete:
+                break
+            next_url = response.links.get('next', {}).get('url')
+            if not next_url:
+                complete = True
+                break
+            response = self.github_api_request(next_url)
+        if complete:
+            self.commit_cache[repo_name] = {'etag': etag, 'sha': head_sha, 'dates': dates}
+        return dates
+
+    def graphql_query(self, query):
+        response = self.send_with_backoff('POST', GRAPHQL_URL, json={'query': query})
+        if response is None:
+            return None
+        if response.status_code != 200:
+            debug_print(f"GitHub GraphQL error {response.status_code}: {response.text}")
+            return None
+        payload = parse_json(response)
+        if payload.get('errors'):
+            debug_print(f"GitHub GraphQL errors: {payload['errors']}")
+            return None
+        return payload.get('data')
+
+    def build_history_query(self, pending):
+        # pending maps alias -> (repo name, history cursor or None)
+        parts = []
+        for alias, (repo_name, cursor) in pending.items():
+            after = f", after: {json.dumps(cursor)}" if cursor else ""
+            parts.append(
+                f"{alias}: repository(owner: {json.dumps(self.owner)}, name: {json.dumps(repo_name)}) {{ "
+                f"defaultBranchRef {{ target {{ ... on Commit {{ history(first: 100{after}) {{ "
+                f"nodes {{ oid authoredDate }} pageInfo {{ hasNextPage endCursor }} }} }} }} }} }}")
+        return "query { " + " ".join(parts) + " }"
+
+    def get_commit_dates_graphql(self, repo_names):
+        fetched = {}  # repo name -> {"sha", "dates"}
+        for start in range(0, len(repo_names), GRAPHQL_BATCH_SIZE):
+            batch = repo_names[start:start + GRAPHQL_BATCH_SIZE]
+            pending = {f"r{i}": (repo_name, None) for i, repo_name in enumerate(batch)}
+            while pending:
+                data = self.graphql_query(self.build_history_query(pending))
+                if data is None:
+                    return None
+                next_pending = {}
+                for alias, (repo_name, _) in pending.items():
+                    branch = (data.get(alias) or {}).get('defaultBranchRef')
+                    if not branch:
+                        continue  # empty repository
+                    history = branch['target']['history']
+                    cached = self.commit_cache.get(repo_name, {})
+                    entry = fetched.setdefault(repo_name, {'sha': None, 'dates': []})
+                    reached_cache = False
+                    for node in history['nodes']:
+                        if entry['sha'] is None:
+                            entry['sha'] = node['oid']
+                        if cached.get('sha') and node['oid'] == cached['sha']:
+                            entry['dates'].extend(cached['dates'])
+                            reached_cache = True
+                            break
+                        entry['dates'].append(to_local_date(node['authoredDate']))
+                    if not reached_cache and history['pageInfo']['hasNextPage']:
+                        next_pending[alias] = (repo_name, history['pageInfo']['endCursor'])
+                pending = next_pending
+
+        dates = []
+        for repo_name, entry in fetched.items():
+            # No REST ETag for GraphQL results; the head SHA is enough to resume
+            self.commit_cache[repo_name] = {'etag': None, 'sha': entry['sha'], 'dates': entry['dates']}
+            dates.extend(entry['dates'])
         return dates
 
     def get_all_commit_dates(self):
-        repos = self.get_all_repos()
-        if not repos:
+        repos, complete = self.get_all_repos()
+        self.load_commit_cache()
+        repo_names = [repo['name'] for repo in repos]
+        if not complete:
+            # A partial listing says nothing about the missing repos; keep using their cached dates
+            repo_names += [name for name in self.commit_cache if name not in repo_names]
+        if not repo_names:
             return []
-        all_dates = []
-        for repo in repos:
-            repo_name = repo['name']
-            debug_print(f"Fetching commits for {repo_name}")
-            commits = self.get_commit_dates_for_repo(repo_name)
-            all_dates.extend(commits)
-        unique_dates = list(set(all_dates))
-        return unique_dates
-
-    def get_local_commit_dates(self):
-        # fallback: get commit dates from local git log
+        all_dates = None
+        if self.token:
+            # GraphQL needs authentication; fall back to REST if it fails
+            all_dates = self.get_commit_dates_graphql(repo_names)
+        if all_dates is None:
+            all_dates = []
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                futures = [executor.submit(self.get_commit_dates_for_repo, name) for name in repo_names]
+                for future in futures:
+                    all_dates.extend(future.result())
+        if complete:
+            # Drop repositories that no longer exist
+            self.commit_cache = {name: self.commit_cache[name] for name in repo_names if name in self.commit_cache}
+        self.save_commit_cache()
+        # One entry per commit so callers can count commits per day
+        return all_dates
+
+    def get_local_activity(self, since=None):
+        # One git log call gives the commit dates and HEAD's --numstat line counts
+        # --exclude must precede --all; stash entries are internal commits, not the user's work
+        cmd = ["git", "log", "--exclude=refs/stash", "--all", "--numstat",
+               "--pretty=format:%x00%ad%x00%P%x00%D", "--date=short-local"]
+        if since is not None:
+            cmd.append(f"--since={since}")
+        # --diff-merges=first-parent makes a merge report its diff against the first parent.
+        # git < 2.31 rejects it; retry without so the commit dates survive (merges then count as 0).
+        activity = self.read_local_log(cmd + ["--diff-merges=first-parent"])
+        if activity is None:
+            activity = self.read_local_log(cmd)
+        return activity if activity is not None else ([], 0)
+
+    def read_local_log(self, cmd):
+        dates = []
+        intensity = 0
+        count_lines = False
         try:
-            res = subprocess.run(
-                ["git", "log", "--pretty=format:%ad", "--date=short"],
-                capture_output=True,
-                text=True,
-                check=True,
-                cwd=BASE_DIR)
-            dates = res.stdout.strip().split('\n')
-            return dates
+            with subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1,
+                    cwd=BASE_DIR) as proc:
+                for line in proc.stdout:
+                    if line.startswith("\0"):
+                        date, parents, refs = line[1:].rstrip("\n").split("\0")
+                        dates.append(date)
+                        # %D lists "HEAD -> branch" (or bare "HEAD" when detached) on HEAD's record.
+                        # A root commit has nothing to diff against, so it has no intensity.
+                        is_head = any(ref == "HEAD" or ref.startswith("HEAD -> ") for ref in refs.split(", "))
+                        count_lines = is_head and bool(parents)
+                    elif count_lines:
+                        # "<added>\t<deleted>\t<path>", with "-" counts for binary files
+                        parts = line.split("\t", 2)
+                        if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit():
+                            intensity += int(parts[0]) + int(parts[1])
+            if proc.returncode != 0:
+                return None
+            return dates, intensity
         except Exception:
-            return []
+            return None
 
 
 class SessionLogger:
     def __init__(self, data_dir):
-        self.log_file = os.path.join(data_dir, "focus_log.json")
-        self.mood_file = os.path.join(data_dir, "mood_log.json")
+        self.log_file = os.path.join(data_dir, "focus_log.jsonl")
+        self.mood_file = os.path.join(data_dir, "mood_log.jsonl")
         self.notes_file = os.path.join(data_dir, "task_notes.txt")
+        # Convert logs written by older versions (one JSON array per file)
+        self._migrate_json_log(os.path.join(data_dir, "focus_log.json"), self.log_file)
+        self._migrate_json_log(os.path.join(data_dir, "mood_log.json"), self.mood_file)
         # Initialize files if not exist
-        if not os.path.exists(self.log_file):
-            with open(self.log_file, "w") as f:
-                json.dump([], f)
-        if not os.path.exists(self.mood_file):
-            with open(self.mood_file, "w") as f:
-                json.dump([], f)
+        for path in (self.log_file, self.mood_file):
+            if not os.path.exists(path):
+                open(path, "w").close()
 
     def log_session(self, suggestion, intensity, session_type):
         now = datetime.now().isoformat()
         entry = {"timestamp": now, "suggestion": suggestion, "intensity": intensity, "session_type": session_type}
-        data = self._load_json(self.log_file)
-        data.append(entry)
-        self._save_json(self.log_file, data)
+        self._append_jsonl(self.log_file, entry)
 
     def log_mood(self, mood_score):
         now = datetime.now().isoformat()
         entry = {"timestamp": now, "mood": mood_score}
-        data = self._load_json(self.mood_file)
-        data.append(entry)
-        self._save_json(self.mood_file, data)
+        self._append_jsonl(self.mood_file, entry)
 
     def save_note(self, note):
         with open(self.notes_file, "a", encoding="utf-8") as f:
@@ -161,85 +440,96 @@ class SessionLogger:
             f.write(f"{now} - {note}\n")
 
     def get_mood_trend(self, days=7):
-        data = self._load_json(self.mood_file)
-        cutoff = datetime.now() - timedelta(days=days)
-        filtered = [e for e in data if datetime.fromisoformat(e["timestamp"]) > cutoff]
-        return filtered
+        data = self._load_jsonl(self.mood_file)
+        # ISO timestamps compare correctly as strings, so no per-entry fromisoformat
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        return [e for e in data if e["timestamp"] > cutoff]
+
+    def _migrate_json_log(self, legacy_path, path):
+        if os.path.exists(path) or not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            # Leave an unreadable (e.g. truncated) legacy log untouched so it can be recovered by hand
+            print(f"⚠️ Could not convert {legacy_path} ({e}); left it in place.", file=sys.stderr)
+            return
+        self._save_jsonl(path, entries)
+        os.replace(legacy_path, legacy_path + ".bak")
+
+    def _append_jsonl(self, path, entry):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
 
-    def _load_json(self, path):
+    def _load_jsonl(self, path):
+        entries = []
         try:
             with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        pass  # skip a line torn by an interrupted write
         except Exception:
             return []
+        return entries
 
-    def _save_json(self, path, data):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+    def _save_jsonl(self, path, entries):
+        write_atomic(path, "".join(json.dumps(entry) + "\n" for entry in entries))
 
 
 class TimeboxPlanner:
-    def __init__(self):
+    def __init__(self, all_repos=False):
+        self.all_repos = all_repos
         self.owner = GITHUB_OWNER
         self.token = GITHUB_TOKEN
-        self.git = GitAnalyzer(self.owner, self.token)
+        self.git = GitAnalyzer(self.owner, self.token,
+                               cache_file=os.path.join(DATA_DIR, "commits_cache.json"),
+                               http_cache_name=os.path.join(DATA_DIR, "gh_cache"))
         self.logger = SessionLogger(DATA_DIR)
         self.quiet_hours = QUIET_HOURS
+        self.local_activity = {}  # since date -> (commit dates, intensity)
+        self.timer_stop = threading.Event()
 
-    def get_commit_count_last_days(self, days=7):
-        # Prefer local first, fallback to GitHub API if token exists
+    def get_local_activity(self, today, days=7):
+        if not BASE_DIR:
+            return [], 0
+        since = today - timedelta(days=days)
+        if since not in self.local_activity:
+            self.local_activity[since] = self.git.get_local_activity(since)
+        return self.local_activity[since]
+
+    def get_commit_count_last_days(self, today, day_strs):
+        # Local git log by default; all GitHub repos only when asked for
         dates = []
-        if BASE_DIR:
-            dates = self.git.get_local_commit_dates()
-        if (not dates or len(dates) < 3) and self.token:
+        if self.all_repos:
             dates = self.git.get_all_commit_dates()
+        elif BASE_DIR:
+            dates, _ = self.get_local_activity(today, len(day_strs))
         if not dates:
-            return 0, []
-
-        today = datetime.today().date()
-        recent_dates = []
-        count = 0
-        for i in range(days):
-            day = today - timedelta(days=i)
-            str_day = str(day)
-            day_commits = dates.count(str_day)
-            if day_commits > 0:
-                count += day_commits
-                recent_dates.append(str_day)
-        return count, recent_dates
-
-    def calculate_streak(self, commit_dates):
-        today = datetime.today().date()
+            return 0, Counter()
+
+        commits_per_day = Counter(dates)
+        recent_counts = Counter({day: commits_per_day[day] for day in day_strs if commits_per_day[day]})
+        return sum(recent_counts.values()), recent_counts
+
+    def calculate_streak(self, commit_dates, today):
+        commit_dates = set(commit_dates)
+        day = today
         streak = 0
-        for i in range(100):
-            day = today - timedelta(days=i)
-            if str(day) in commit_dates:
-                streak += 1
-            else:
-                if i == 0:
-                    break
-                else:
-                    return streak
+        while str(day) in commit_dates:
+            streak += 1
+            day -= timedelta(days=1)
         return streak
 
-    def get_work_intensity(self):
-        # Analyze last commit diff lines added/removed as proxy intensity
-        if not BASE_DIR:
-            return 0
-        try:
-            # last commit diff stats summary
-            res = subprocess.run(
-                ["git", "diff", "--shortstat", "HEAD~1", "HEAD"],
-                capture_output=True, text=True, check=True, cwd=BASE_DIR)
-            out = res.stdout.strip()
-            match = re.search(r"(\d+) insertions?\(\+\)", out)
-            insertions = int(match.group(1)) if match else 0
-            match = re.search(r"(\d+) deletions?\(-\)", out)
-            deletions = int(match.group(1)) if match else 0
-            intensity = insertions + deletions
-            return intensity
-        except Exception:
-            return 0
+    def get_work_intensity(self, today):
+        # Lines added/removed in the HEAD commit as proxy intensity
+        _, intensity = self.get_local_activity(today)
+        return intensity
 
     def suggest_timebox(self, commit_count, intensity):
         # Combine commit count and intensity for suggestions
@@ -252,21 +542,16 @@ class TimeboxPlanner:
         else:
             return "No recent commits: Start with a 25 min Pomodoro + 5 min break", "pomodoro"
 
-    def print_commit_graph(self, commit_dates, days=7):
+    def print_commit_graph(self, commit_counts, day_strs):
         print("\n📊 Git Pulse (last 7 days commits):")
-        today = datetime.today().date()
-        counts = []
-        for i in reversed(range(days)):
-            day = today - timedelta(days=i)
-            count = commit_dates.count(str(day))
-            counts.append(count)
+        counts = [commit_counts.get(day, 0) for day in day_strs]
         max_count = max(counts) if counts else 1
         max_count = max(max_count, 1)
         for i, count in enumerate(counts):
             bar = "█" * count if count > 0 else "-"
             print(f"Day {i+1}: {bar} ({count})")
 
-    def print_mood_trend(self, mood_entries, days=7):
+    def print_mood_trend(self, mood_entries, day_strs):
         print("\n🙂 Mood trend (last 7 days):")
         if not mood_entries:
             print("No mood data recorded.")
@@ -274,16 +559,13 @@ class TimeboxPlanner:
         # Aggregate mood by day
         day_map = {}
         for entry in mood_entries:
-            dt = datetime.fromisoformat(entry["timestamp"]).date()
-            day_map.setdefault(dt, []).append(entry["mood"])
+            day_map.setdefault(entry["timestamp"][:10], []).append(entry["mood"])
         # Average mood per day
-        today = datetime.today().date()
-        for i in reversed(range(days)):
-            day = today - timedelta(days=i)
+        for i, day in enumerate(day_strs, 1):
             moods = day_map.get(day, [])
             avg = round(sum(moods)/len(moods), 2) if moods else None
             bar = "█" * int(avg) if avg else "-"
-            print(f"Day {days - i}: {bar} ({avg if avg else '-'})")
+            print(f"Day {i}: {bar} ({avg if avg else '-'})")
 
     def show_achievements(self, streak):
         print("\n🏆 Achievements:")
@@ -322,32 +604,60 @@ class TimeboxPlanner:
         except Exception:
             print("Invalid input. Mood not logged.")
 
+    def cancel_timer(self, *_):
+        self.timer_stop.set()
+
     def start_timer(self, minutes):
+        self.timer_stop.clear()
+        try:
+            # Ctrl+C sets the stop event so the wait below returns immediately
+            previous_handler = signal.signal(signal.SIGINT, self.cancel_timer)
+        except ValueError:
+            previous_handler = None  # not on the main thread; cancel_timer() still works
         try:
-            total_seconds = minutes * 60
+            deadline = time.monotonic() + minutes * 60
             print(f"\n⏱️ Starting timer for {minutes} minutes. Press Ctrl+C to cancel.")
-            while total_seconds > 0:
-                mins, secs = divmod(total_seconds, 60)
-                timer = f"{mins:02d}:{secs:02d}"
-                print(f"\rTime left: {timer}", end="")
-                time.sleep(1)
-                total_seconds -= 1
+            write, flush = sys.stdout.write, sys.stdout.flush
+            last_shown = None
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Round up so the display reads 00:01 during the final second
+                shown = int(remaining) + (remaining % 1 > 0)
+                if shown != last_shown:
+                    mins, secs = divmod(shown, 60)
+                    # One write per redraw; "\r" without a newline is not flushed by line buffering
+                    write(f"\rTime left: {mins:02d}:{secs:02d}")
+                    flush()
+                    last_shown = shown
+                # Wait to the next whole-second boundary rather than a fixed 1s
+                if self.timer_stop.wait(remaining % 1 or 1.0):
+                    print("\n⏸️ Timer cancelled.")
+                    return
             print("\n⏰ Time's up! Take a break or start a new session.")
             if toaster:
                 toaster.show_toast("Timebox Timer", "Time's up! Take a break or start a new session.", duration=5)
         except KeyboardInterrupt:
             print("\n⏸️ Timer cancelled.")
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
 
     def run(self):
-        if is_in_quiet_hours():
+        # Resolve the clock once; every helper below works off the same day
+        now = datetime.now()
+        today = now.date()
+        day_strs = recent_days(today)
+        if is_in_quiet_hours(now):
             print("⚠️ Currently in quiet hours — no session suggestions or timers.")
             return
 
-        count, recent_dates = self.get_commit_count_last_days()
-        intensity = self.get_work_intensity()
+        count, recent_counts = self.get_commit_count_last_days(today, day_strs)
+        intensity = self.get_work_intensity(today)
         suggestion, session_type = self.suggest_timebox(count, intensity)
-        now_str = datetime.now().strftime("%A, %I:%M %p")
-        streak = self.calculate_streak(recent_dates)
+        now_str = now.strftime("%A, %I:%M %p")
+        streak = self.calculate_streak(recent_counts, today)
 
         print("⏳ Context-Aware Timebox Planner (Enhanced CLI)")
         print("-" * 50)
@@ -358,8 +668,8 @@ class TimeboxPlanner:
         print(f"Current time: {now_str}")
 
         self.show_achievements(streak)
-        self.print_commit_graph(recent_dates)
-        self.print_mood_trend(self.logger.get_mood_trend())
+        self.print_commit_graph(recent_counts, day_strs)
+        self.print_mood_trend(self.logger.get_mood_trend(), day_strs)
 
         self.logger.log_session(suggestion, intensity, session_type)
 
@@ -372,7 +682,7 @@ class TimeboxPlanner:
                 self.logger.save_note(note)
                 print("📝 Note saved.")
             self.prompt_mood()
-            mins_match = re.search(r"(\d+)", suggestion)
+            mins_match = FIRST_INT_RE.search(suggestion)
             minutes = int(mins_match.group(1)) if mins_match else 25
             self.start_timer(minutes)
         else:
@@ -380,6 +690,13 @@ class TimeboxPlanner:
 
 def main():
     global BASE_DIR, DATA_DIR
+    parser = argparse.ArgumentParser(description="Context-aware timebox planner driven by your git activity.")
+    parser.add_argument(
+        "--all-repos", action="store_true",
+        help="count commits across all of GITHUB_OWNER's GitHub repositories instead of the local repo "
+             "(uses the GitHub API; set GITHUB_PAT for a higher rate limit)")
+    args = parser.parse_args()
+
     BASE_DIR = get_git_root()
     if not BASE_DIR:
         print("⚠️ Not inside a git repository. Please cd into a git repo folder and rerun.")
@@ -389,7 +706,7 @@ def main():
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
 
-    planner = TimeboxPlanner()
+    planner = TimeboxPlanner(all_repos=args.all_repos)
     planner.run()
 
 